@@ -12,129 +12,212 @@ import numpy as np
 import matplotlib.pyplot as plt
 import os
 
-# Initialization
-dimy = 64
-dimz = 64
-order = 1
-angleNr = 10
-display = False
-outputdir = './output/'
-exportList = True
-reps = 1
-viewSpeed = 1000
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional; without it the NumPy spoke builder is used
+    njit = None
 
+# Golden angles (degrees) selected by angleNr
 tinyGoldenAngles = [111.24611, 68.75388, 49.75077, 38.97762, 32.03967,
                     27.19840, 23.62814, 20.88643, 18.71484, 16.95229]
 
-rev = 1
-numPointsTarget = dimy * dimz
-numSamplesPerSpoke = 2 * max(dimy, dimz)
-t = np.linspace(-1, 1, numSamplesPerSpoke)
-
-ry = dimy / 2
-rz = dimz / 2
-
-kSpaceList = []
-angle = 0
-spokeNr = 0
-
-while len(kSpaceList) < numPointsTarget:
-    spokeNr += 1
-    angle += tinyGoldenAngles[angleNr - 1]
-    theta = np.deg2rad(angle)
-
-    y = np.round(t * np.cos(theta) * ry).astype(int)
-    z = np.round(t * np.sin(theta) * rz).astype(int)
-
-    if order == 1 and spokeNr % 2 == 0:
-        y = np.flip(y)
-        z = np.flip(z)
-
-    spoke = list(zip(y, z))
-    seen = set()
-    spoke_unique = []
-    for pt in spoke:
-        if pt not in seen:
-            seen.add(pt)
-            spoke_unique.append(pt)
-
-    spoke_inside = [pt for pt in spoke_unique if (pt[0]**2 / ry**2 + pt[1]**2 / rz**2) <= 1]
-
-    kSpaceList.extend(spoke_inside)
-
-    if len(kSpaceList) > numPointsTarget:
-        kSpaceList = kSpaceList[:numPointsTarget]
-        break
-
-kSpaceArray = np.array(kSpaceList)
-uniquePoints, indices = np.unique(kSpaceArray, axis=0, return_inverse=True)
-numUnique = uniquePoints.shape[0]
-numTotal = kSpaceArray.shape[0]
-avgSamplesPerPoint = numTotal / numUnique
-
-Ygrid, Zgrid = np.meshgrid(np.arange(-dimy//2, dimy//2),
-                           np.arange(-dimz//2, dimz//2))
-ellipticalMask = (Ygrid**2 / ry**2 + Zgrid**2 / rz**2) <= 1
-numEllipticalPoints = np.count_nonzero(ellipticalMask)
-coveredFraction = 100 * numUnique / numEllipticalPoints
-
-if exportList:
-    os.makedirs(outputdir, exist_ok=True)
-    ord = 'r' if order == 1 else 'o'
-    filename = os.path.join(outputdir, f'exLUT_radial_y{dimy}_z{dimz}_a{round(tinyGoldenAngles[angleNr-1],2)}_r{reps}.txt')
-    with open(filename, 'w') as f:
-        for y, z in kSpaceArray:
-            f.write(f"{y}\n{z}\n")
-
-if display:
-    pixelSize = 10
-    figWidth = dimy * pixelSize
-    figHeight = dimz * pixelSize
-
-    fig = plt.figure(figsize=(figWidth / 100, figHeight / 100), facecolor='black')
-    ax = fig.add_axes([0.05, 0.05, 0.8, 0.85])
-    ax.set_facecolor('black')
-    ax.axis('off')
-
-    frameMask = np.zeros((dimz, dimy), dtype=int)
-    img = ax.imshow(frameMask, cmap='viridis', vmin=0.5, vmax=1)
-
-    ky_idx = kSpaceArray[:, 0] + dimy // 2
-    kz_idx = kSpaceArray[:, 1] + dimz // 2
-
-    for cnt in range(kSpaceArray.shape[0]):
-        y, z = ky_idx[cnt], kz_idx[cnt]
-        if 0 <= y < dimy and 0 <= z < dimz:
-            frameMask[z, y] += 1
-            img.set_data(frameMask)
-            img.set_clim(vmin=0.5, vmax=max(1, frameMask.max()))
-            plt.pause(1 / viewSpeed)
-
-    cbar = fig.colorbar(img, ax=ax, fraction=0.046, pad=0.04)
-    cbar.set_label('# samples per k-space location', color='white')
-    cbar.ax.yaxis.set_tick_params(color='white')
-    plt.setp(plt.getp(cbar.ax.axes, 'yticklabels'), color='white')
-
-    fig.suptitle('Pseudo-radial k-space fill', color='white', fontsize=16)
-    plt.show()
+# Spoke kernel
+# Samples along a spoke are monotone in y and z, so repeated points after
+# rounding are always adjacent and dedup reduces to comparing with the
+# previous sample
+def buildRadial(t, ry, rz, angleStep, order, numPointsTarget):
+    ky = np.empty(numPointsTarget, np.int16)
+    kz = np.empty(numPointsTarget, np.int16)
+    ry2 = ry * ry
+    rz2 = rz * rz
+    limit = ry2 * rz2
+    n = t.shape[0]
+    cnt = 0
+    dtheta = np.deg2rad(angleStep)
+    spokeNr = 0
+
+    while cnt < numPointsTarget:
+        spokeNr += 1
+        theta = spokeNr * dtheta
+        cy = np.cos(theta) * ry
+        cz = np.sin(theta) * rz
+        flip = order == 1 and spokeNr % 2 == 0
+
+        first = True
+        prevY = 0
+        prevZ = 0
+        for i in range(n):
+            j = n - 1 - i if flip else i
+            y = int(np.rint(t[j] * cy))
+            z = int(np.rint(t[j] * cz))
+            if not first and y == prevY and z == prevZ:
+                continue
+            first = False
+            prevY = y
+            prevZ = z
+            if y * y * rz2 + z * z * ry2 <= limit:
+                ky[cnt] = y
+                kz[cnt] = z
+                cnt += 1
+                if cnt == numPointsTarget:
+                    break
+
+    return ky, kz, spokeNr, spokeNr * angleStep
+
+# NumPy spoke builder
+# Same trajectory as the kernel, vectorized per spoke for use without Numba
+def buildRadialNumpy(t, ry, rz, angleStep, order, numPointsTarget):
+    kyList = []
+    kzList = []
+    ry2 = ry * ry
+    rz2 = rz * rz
+    limit = ry2 * rz2
+    cnt = 0
+    dtheta = np.deg2rad(angleStep)
+    spokeNr = 0
+
+    while cnt < numPointsTarget:
+        spokeNr += 1
+        theta = spokeNr * dtheta
+
+        y = np.rint(t * np.cos(theta) * ry).astype(np.int32)
+        z = np.rint(t * np.sin(theta) * rz).astype(np.int32)
+
+        if order == 1 and spokeNr % 2 == 0:
+            y = np.flip(y)
+            z = np.flip(z)
+
+        keep = np.empty(len(y), dtype=bool)
+        keep[0] = True
+        keep[1:] = (y[1:] != y[:-1]) | (z[1:] != z[:-1])
+        y = y[keep]
+        z = z[keep]
+
+        inside = y * y * rz2 + z * z * ry2 <= limit
+        kyList.append(y[inside])
+        kzList.append(z[inside])
+        cnt += np.count_nonzero(inside)
+
+    ky = np.concatenate(kyList)[:numPointsTarget].astype(np.int16)
+    kz = np.concatenate(kzList)[:numPointsTarget].astype(np.int16)
+    return ky, kz, spokeNr, spokeNr * angleStep
+
+if njit is not None:
+    buildRadial = njit(cache=True)(buildRadial)
+else:
+    buildRadial = buildRadialNumpy
+
+# Pseudo-radial trajectory
+# Returns the int16 ky and kz coordinates, the number of spokes used and the
+# total rotation angle in degrees
+def radialTrajectory(dimy=64, dimz=64, order=1, angleNr=10):
+    numPointsTarget = dimy * dimz
+    numSamplesPerSpoke = 2 * max(dimy, dimz)
+    t = np.linspace(-1, 1, numSamplesPerSpoke)
+
+    ry = dimy / 2
+    rz = dimz / 2
+
+    return buildRadial(t, ry, rz, tinyGoldenAngles[angleNr - 1], order, numPointsTarget)
 
 def ternary(cond, valTrue, valFalse):
     return valTrue if cond else valFalse
 
-ky_min, kz_min = kSpaceArray.min(axis=0)
-ky_max, kz_max = kSpaceArray.max(axis=0)
-
-print('\n--- k-space trajectory summary ---')
-print(f'Trajectory type     : Pseudo-radial')
-print(f'Dimensions (ky × kz): {dimy} × {dimz}')
-print(f'Total samples       : {numTotal}')
-print(f'Unique positions    : {numUnique} / {numEllipticalPoints} ({coveredFraction:.1f}% coverage of elliptical mask)')
-print(f'Avg samples/point   : {avgSamplesPerPoint:.2f}')
-print(f'Spoke direction     : {ternary(order==1, "Alternating", "Unidirectional")}')
-print(f'Golden angle used   : {tinyGoldenAngles[angleNr-1]:.5f}° (index {angleNr})')
-print(f'Effective spokes    : {spokeNr}')
-print(f'Revolutions approx. : {angle / 360:.2f}')
-print(f'ky range            : {ky_min} to {ky_max}')
-print(f'kz range            : {kz_min} to {kz_max}')
-print(f'Output file         : {filename}')
-print('----------------------------------\n')
+if __name__ == "__main__":
+    # Initialization
+    dimy = 64
+    dimz = 64
+    order = 1
+    angleNr = 10
+    display = False
+    outputdir = './output/'
+    exportList = True
+    reps = 1
+    viewSpeed = 1000
+    animateEvery = 0
+
+    ky, kz, spokeNr, angle = radialTrajectory(dimy, dimz, order, angleNr)
+
+    ry = dimy / 2
+    rz = dimz / 2
+
+    # Count unique (ky, kz) positions with one histogram over the bounding box
+    # of the trajectory; the box limits double as the summary ranges
+    ky_min, ky_max = ky.min(), ky.max()
+    kz_min, kz_max = kz.min(), kz.max()
+    key = (kz - kz_min).astype(np.intp) * (ky_max - ky_min + 1) + (ky - ky_min)
+    numUnique = np.count_nonzero(np.bincount(key))
+    numTotal = ky.size
+    avgSamplesPerPoint = numTotal / numUnique
+
+    # Ellipse test without divisions, broadcast over ky (columns) and kz (rows)
+    ry2 = ry * ry
+    rz2 = rz * rz
+    Ygrid = np.arange(-dimy//2, dimy//2)
+    Zgrid = np.arange(-dimz//2, dimz//2)[:, None]
+    ellipticalMask = Ygrid * Ygrid * rz2 + Zgrid * Zgrid * ry2 <= ry2 * rz2
+    numEllipticalPoints = np.count_nonzero(ellipticalMask)
+    coveredFraction = 100 * numUnique / numEllipticalPoints
+
+    if exportList:
+        os.makedirs(outputdir, exist_ok=True)
+        ord = 'r' if order == 1 else 'o'
+        filename = os.path.join(outputdir, f'exLUT_radial_y{dimy}_z{dimz}_a{round(tinyGoldenAngles[angleNr-1],2)}_r{reps}.txt')
+        data = np.empty(2 * numTotal, dtype=np.int32)
+        data[0::2] = ky
+        data[1::2] = kz
+        with open(filename, 'w') as f:
+            f.write("\n".join(map(str, data.tolist())) + "\n")
+
+    if display:
+        pixelSize = 10
+        figWidth = dimy * pixelSize
+        figHeight = dimz * pixelSize
+
+        fig = plt.figure(figsize=(figWidth / 100, figHeight / 100), facecolor='black')
+        ax = fig.add_axes([0.05, 0.05, 0.8, 0.85])
+        ax.set_facecolor('black')
+        ax.axis('off')
+
+        frameFlat = np.zeros(dimy * dimz, dtype=int)
+        frameMask = frameFlat.reshape(dimz, dimy)
+        img = ax.imshow(frameMask, cmap='viridis', vmin=0.5, vmax=1)
+
+        ky_idx = ky + dimy // 2
+        kz_idx = kz + dimz // 2
+        valid = (ky_idx >= 0) & (ky_idx < dimy) & (kz_idx >= 0) & (kz_idx < dimz)
+        flatIdx = kz_idx[valid].astype(np.intp) * dimy + ky_idx[valid]
+
+        # Histogram the samples per k-space location, redrawing every
+        # animateEvery samples (0 only draws the final frame)
+        step = max(1, animateEvery if animateEvery > 0 else flatIdx.size)
+        for start in range(0, flatIdx.size, step):
+            frameFlat += np.bincount(flatIdx[start:start + step], minlength=dimy * dimz)
+            img.set_data(frameMask)
+            img.set_clim(vmin=0.5, vmax=max(1, frameMask.max()))
+            if animateEvery > 0:
+                plt.pause(1 / viewSpeed)
+
+        cbar = fig.colorbar(img, ax=ax, fraction=0.046, pad=0.04)
+        cbar.set_label('# samples per k-space location', color='white')
+        cbar.ax.yaxis.set_tick_params(color='white')
+        plt.setp(plt.getp(cbar.ax.axes, 'yticklabels'), color='white')
+
+        fig.suptitle('Pseudo-radial k-space fill', color='white', fontsize=16)
+        plt.show()
+
+    print('\n--- k-space trajectory summary ---')
+    print(f'Trajectory type     : Pseudo-radial')
+    print(f'Dimensions (ky × kz): {dimy} × {dimz}')
+    print(f'Total samples       : {numTotal}')
+    print(f'Unique positions    : {numUnique} / {numEllipticalPoints} ({coveredFraction:.1f}% coverage of elliptical mask)')
+    print(f'Avg samples/point   : {avgSamplesPerPoint:.2f}')
+    print(f'Spoke direction     : {ternary(order==1, "Alternating", "Unidirectional")}')
+    print(f'Golden angle used   : {tinyGoldenAngles[angleNr-1]:.5f}° (index {angleNr})')
+    print(f'Effective spokes    : {spokeNr}')
+    print(f'Revolutions approx. : {angle / 360:.2f}')
+    print(f'ky range            : {ky_min} to {ky_max}')
+    print(f'kz range            : {kz_min} to {kz_max}')
+    print(f'Output file         : {filename}')
+    print('----------------------------------\n')